@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import create_engine
+
+from redbus_ingest import Loader
+from redbus_migrations import create_indexes, create_table
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A fresh SQLite database for each test."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'redbus.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def load_rows(engine):
+    """Upsert scraped rows into a table of the test database, as redbus_ingest.py does."""
+    def load(df, source="test", table="redbus_details"):
+        create_table(engine, table)
+        create_indexes(engine, table, suffix=f"_{table}")
+        loader = Loader(engine, table=table)
+        loader.add(df.astype(object).where(df.notna(), None).assign(source=source).to_dict("records"))
+        loader.flush()
+        return loader.loaded
+    return load
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from redbus_data import _filter_raw, filter_buses, normalize_bus_data, to_display
+from redbus_db import build_bus_query, run_query
+from redbus_facets import FACET_ORDER, RouteFacets
+from redbus_ingest import Loader
+from redbus_migrations import create_indexes, create_table, drop_table
+from redbus_ranking import rank_closest_matches, rank_closest_matches_batch
+from redbus_synth import generate_bus_data
+
+# Scratch table the benchmark loads, so a local MySQL database keeps its real data
+BENCH_TABLE = "redbus_bench"
+
+# A stage counts as a regression when it is this much slower than the baseline
+DEFAULT_TOLERANCE = 1.25
+
+FILTER_COLUMNS = ['bus_type', 'departing_time', 'reaching_time', 'duration', 'star_rating']
+
+
+def measure(func, repeat):
+    """Median seconds of ``repeat`` calls, and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def _filters_from(row):
+    """Exact-match filters selecting the bus in ``row``, as the bus details page builds them."""
+    filters = {col: row[col] for col in FILTER_COLUMNS}
+    filters.update(min_price=row['price'], max_price=row['price'])
+    return filters
+
+
+def _cascade(frame):
+    """Walk the facet dropdowns top to bottom, taking the first option each time, as a user would."""
+    facets = RouteFacets(frame)
+    selections = {}
+    for facet in FACET_ORDER:
+        if facet == 'price':
+            selections['price'] = facets.price_bounds(selections)
+            continue
+        options = facets.options(facet, selections)
+        if options:
+            selections[facet] = options[0][0]
+    return facets.rows(selections)
+
+
+def run_benchmark(engine, rows, repeat=5, batch_size=5000, seed=0):
+    """Load ``rows`` synthetic rows into the scratch table and time each hot path in milliseconds."""
+    results = {}
+
+    def record(stage, func, times=repeat):
+        seconds, result = measure(func, times)
+        results[stage] = round(seconds * 1000, 3)
+        return result
+
+    raw = generate_bus_data(rows, seed=seed)
+    drop_table(engine, BENCH_TABLE)
+    create_table(engine, BENCH_TABLE)
+    create_indexes(engine, BENCH_TABLE, suffix=f"_{BENCH_TABLE}")
+
+    def insert():
+        loader = Loader(engine, batch_size=batch_size, table=BENCH_TABLE)
+        records = raw.astype(object).where(raw.notna(), None).assign(source=BENCH_TABLE)
+        loader.add(records.to_dict("records"))
+        loader.flush()
+        return loader.loaded
+    # Rerunning the load upserts over the same keys, so later runs time the update path
+    record("insert", insert, times=1)
+    record("upsert_existing", insert, times=1)
+
+    everything = record("full_fetch", lambda: run_query(f"SELECT * FROM {BENCH_TABLE}", engine=engine, cache=None))
+    normalized = record("normalize_all", lambda: normalize_bus_data(everything))
+
+    # The busiest route, as the skewed route distribution puts most rows there
+    route = everything['route_name'].value_counts().index[0]
+    route_query = build_bus_query(route, table=BENCH_TABLE)
+    route_raw = record("route_fetch", lambda: run_query(*route_query, engine=engine, cache=None))
+    route_df = record("route_normalize", lambda: normalize_bus_data(route_raw))
+    record("route_filter", lambda: normalized[(normalized['route_name'] == route).to_numpy()])
+
+    position = len(route_df) // 2
+    raw_filters = _filters_from(route_raw.iloc[position])
+    typed_filters = _filters_from(route_df.iloc[position])
+    record("exact_filter_raw", lambda: _filter_raw(route_raw, raw_filters))
+    record("exact_filter", lambda: filter_buses(route_df, typed_filters))
+    record("facet_cascade", lambda: _cascade(route_df))
+
+    # Criteria that match nothing exactly, so the page falls back to the closest matches
+    near = dict(typed_filters, departing_time=(typed_filters['departing_time'] + 7) % 1440)
+    matches = record("closest_matches", lambda: rank_closest_matches(route_df, near, k=10))
+    record("closest_matches_all_routes", lambda: rank_closest_matches(normalized, near, k=10))
+    record("closest_matches_batch_50", lambda: rank_closest_matches_batch(route_df, [near] * 50, k=10))
+
+    record("render_prep", lambda: to_display(matches))
+    record("render_prep_route", lambda: to_display(route_df))
+
+    drop_table(engine, BENCH_TABLE)
+    return {"rows": len(raw), "route_rows": len(route_df), "stages_ms": results}
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """List ``(size, stage, baseline_ms, current_ms)`` for every stage slower than tolerance allows."""
+    regressions = []
+    for size, result in current.items():
+        previous = baseline.get(size)
+        if previous is None:
+            continue
+        for stage, ms in result["stages_ms"].items():
+            before = previous["stages_ms"].get(stage)
+            if before and ms > before * tolerance:
+                regressions.append((size, stage, before, ms))
+    return regressions
+
+
+def main():
+    """Benchmark the app's hot paths on synthetic data of increasing size."""
+    parser = argparse.ArgumentParser(description="Benchmark the redbus hot paths on synthetic data.")
+    parser.add_argument("--db-url", help="SQLAlchemy URL of a scratch database (defaults to a temporary SQLite file)")
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated row counts, e.g. 10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage; the median is reported")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per insert batch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file, e.g. to use as a baseline")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --json run; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="slowdown factor over the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    db_url = args.db_url
+    if db_url is None:
+        db_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db").replace("\\", "/")
+    engine = create_engine(db_url, pool_pre_ping=True)
+
+    results = {}
+    for size in [int(size) for size in args.sizes.split(",")]:
+        print(f"Benchmarking {size:,} rows...")
+        results[str(size)] = run_benchmark(engine, size, args.repeat, args.batch_size, args.seed)
+
+    sizes = list(results)
+    stages = list(results[sizes[0]]["stages_ms"])
+    print(f"\nDatabase: {engine.url.render_as_string(hide_password=True)}")
+    print(f"{'stage (median ms)':<28}" + "".join(f"{int(size):>14,}" for size in sizes))
+    for stage in stages:
+        print(f"{stage:<28}" + "".join(f"{results[size]['stages_ms'][stage]:>14.2f}" for size in sizes))
+    print(f"{'rows on benchmarked route':<28}" + "".join(f"{results[size]['route_rows']:>14,}" for size in sizes))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote results to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions beyond {args.tolerance:.2f}x:")
+            for size, stage, before, after in regressions:
+                print(f"  {int(size):,} rows, {stage}: {before:.2f} ms -> {after:.2f} ms ({after / before:.2f}x)")
+            raise SystemExit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.2f}x of {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import queue
+import threading
+import uuid
+from concurrent.futures import Future
+
+from sqlalchemy import (Column, DateTime, Integer, MetaData, String, Table, bindparam, func, insert,
+                        inspect, select, text, update)
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from redbus_data import parse_seats
+
+metadata = MetaData()
+
+# Seats left per bus; rows are seeded from redbus_details the first time a bus is booked
+seat_inventory = Table(
+    "seat_inventory", metadata,
+    Column("bus_id", Integer, primary_key=True, autoincrement=False),
+    Column("seats_available", Integer, nullable=False),
+    Column("version", Integer, nullable=False, default=0),
+)
+
+bookings = Table(
+    "bookings", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("idempotency_key", String(64), nullable=False, unique=True),
+    Column("bus_id", Integer, nullable=False, index=True),
+    Column("name", String(255), nullable=False),
+    Column("email", String(255), nullable=False),
+    Column("phone", String(32), nullable=False),
+    Column("seats", Integer, nullable=False),
+    Column("payment_method", String(32), nullable=False),
+    Column("created_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+# Booking outcomes
+CONFIRMED = "confirmed"
+SOLD_OUT = "sold_out"
+UNKNOWN_BUS = "unknown_bus"
+# The idempotency key already booked a different bus or seat count
+KEY_REUSED = "key_reused"
+
+
+def new_idempotency_key():
+    """A fresh key for one booking attempt; resubmitting with the same key never books twice."""
+    return uuid.uuid4().hex
+
+
+def create_booking_tables(engine):
+    """Create the inventory and bookings tables if they do not exist yet."""
+    metadata.create_all(engine, checkfirst=True)
+
+
+def _scraped_inventory(conn, where, values):
+    """Inventory rows matching ``where`` with their version, scraped seat count and seats booked here."""
+    return conn.execute(text(
+        "SELECT i.bus_id, i.version, d.seats_available, COALESCE(SUM(b.seats), 0) AS booked "
+        "FROM seat_inventory i JOIN redbus_details d ON d.ID = i.bus_id "
+        f"LEFT JOIN bookings b ON b.bus_id = i.bus_id WHERE {where} "
+        "GROUP BY i.bus_id, i.version, d.seats_available"
+    ).bindparams(bindparam("values", expanding=True)), {"values": values}).fetchall()
+
+
+def reconcile_inventory(engine, routes):
+    """Refresh the inventory of already-seeded buses on ``routes`` after a load is published.
+
+    A re-scrape's seat count replaces the one the bus was seeded with, less the
+    seats booked here, and buses the load removed lose their inventory. A row
+    booked meanwhile fails its version check and is read again, so no booking
+    is lost.
+    """
+    if not routes or not inspect(engine).has_table(seat_inventory.name):
+        return 0
+    refresh = (
+        update(seat_inventory)
+        .where(seat_inventory.c.bus_id == bindparam("b_bus_id"))
+        .where(seat_inventory.c.version == bindparam("b_version"))
+        .values(seats_available=bindparam("b_seats"), version=seat_inventory.c.version + 1)
+    )
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM seat_inventory WHERE bus_id NOT IN (SELECT ID FROM redbus_details)"))
+    updated, where, values = 0, "d.route_name IN :values", sorted(routes)
+    while values:
+        with engine.begin() as conn:
+            rows = _scraped_inventory(conn, where, values)
+            stale = []
+            for row, seats in zip(rows, parse_seats([row.seats_available for row in rows])):
+                params = {"b_bus_id": row.bus_id, "b_version": row.version,
+                          "b_seats": max(0, int(seats) - int(row.booked))}
+                if conn.execute(refresh, params).rowcount:
+                    updated += 1
+                else:
+                    stale.append(row.bus_id)
+        where, values = "i.bus_id IN :values", stale
+    return updated
+
+
+def seats_left(engine, bus_id):
+    """Seats left on a bus, or None before its inventory is seeded."""
+    with engine.connect() as conn:
+        return conn.execute(
+            select(seat_inventory.c.seats_available).where(seat_inventory.c.bus_id == bus_id)
+        ).scalar()
+
+
+def _seed_bus(conn, bus_id):
+    """Create the inventory row of one bus from redbus_details; False if the bus does not exist."""
+    scraped = conn.execute(text("SELECT seats_available FROM redbus_details WHERE ID = :bus_id"),
+                           {"bus_id": bus_id}).scalar()
+    if scraped is None:
+        return False
+    conn.execute(insert(seat_inventory).values(
+        bus_id=bus_id, seats_available=int(parse_seats([scraped])[0]), version=0))
+    return True
+
+
+def _replay(booking_id, bus_id, seats, request):
+    """The answer to a resubmitted key: the original booking, unless the request asks for another one."""
+    if (bus_id, seats) != (request["bus_id"], request["seats"]):
+        return {"status": KEY_REUSED, "booking_id": booking_id}
+    return {"status": CONFIRMED, "booking_id": booking_id, "replayed": True}
+
+
+def _book(conn, request):
+    """Book one request inside the caller's transaction and return its result."""
+    existing = conn.execute(
+        select(bookings.c.id, bookings.c.bus_id, bookings.c.seats)
+        .where(bookings.c.idempotency_key == request["idempotency_key"])
+    ).first()
+    if existing is not None:
+        return _replay(existing.id, existing.bus_id, existing.seats, request)
+
+    # The conditional decrement is atomic, so concurrent bookers can never take the same seat
+    decrement = (
+        update(seat_inventory)
+        .where(seat_inventory.c.bus_id == request["bus_id"])
+        .where(seat_inventory.c.seats_available >= request["seats"])
+        .values(seats_available=seat_inventory.c.seats_available - request["seats"],
+                version=seat_inventory.c.version + 1)
+    )
+    if conn.execute(decrement).rowcount != 1:
+        left = conn.execute(
+            select(seat_inventory.c.seats_available).where(seat_inventory.c.bus_id == request["bus_id"])
+        ).scalar()
+        if left is None:
+            if not _seed_bus(conn, request["bus_id"]):
+                return {"status": UNKNOWN_BUS}
+            return _book(conn, request)
+        return {"status": SOLD_OUT, "seats_left": left}
+
+    result = conn.execute(insert(bookings).values(
+        idempotency_key=request["idempotency_key"],
+        bus_id=request["bus_id"],
+        name=request.get("name", ""),
+        email=request.get("email", ""),
+        phone=request.get("phone", ""),
+        seats=request["seats"],
+        payment_method=request.get("payment_method", ""),
+    ))
+    return {"status": CONFIRMED, "booking_id": result.inserted_primary_key[0], "replayed": False}
+
+
+class BookingService:
+    """Serializes bookings through one writer thread that commits them in batches.
+
+    Callers block on ``book()`` while the writer groups up to ``batch_size``
+    pending requests into a single transaction, so one commit covers many
+    confirmations. If a batch fails as a whole, its requests are retried one
+    transaction each so a single bad request cannot sink the others.
+    """
+
+    def __init__(self, engine, batch_size=64, max_wait=0.002):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def book(self, request, timeout=30):
+        """Book ``request`` (bus_id, seats, idempotency_key and passenger details) and return the result.
+
+        Raises concurrent.futures.TimeoutError if the writer has not answered
+        within ``timeout`` seconds; the booking may still commit, and
+        resubmitting with the same key returns its outcome.
+        """
+        self._ensure_writer()
+        future = Future()
+        self._queue.put((request, future))
+        return future.result(timeout)
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="booking-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                try:
+                    results = self._commit(batch)
+                except SQLAlchemyError:
+                    results = [self._commit_one(request) for request, future in batch]
+            except Exception as e:
+                # Keep the writer alive; the callers of this batch get the error instead of waiting
+                results = [e] * len(batch)
+            for (request, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _commit(self, batch):
+        results, seen = [], {}
+        with self.engine.begin() as conn:
+            for request, future in batch:
+                key = request["idempotency_key"]
+                if key in seen:
+                    # A resubmit queued behind the original gets the original's outcome
+                    original, result = seen[key]
+                    if result["status"] == CONFIRMED:
+                        results.append(_replay(result["booking_id"], original["bus_id"], original["seats"], request))
+                    else:
+                        results.append(dict(result, replayed=True))
+                    continue
+                result = _book(conn, request)
+                seen[key] = (request, result)
+                results.append(result)
+        return results
+
+    def _commit_one(self, request):
+        for attempt in range(2):
+            try:
+                with self.engine.begin() as conn:
+                    return _book(conn, request)
+            except IntegrityError:
+                # Another writer inserted the same key or seeded the same bus; look again
+                continue
+            except SQLAlchemyError as e:
+                return e
+        return SQLAlchemyError("Booking could not be completed")
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_booking_service(engine):
+    """Return the process-wide booking service for an engine, creating its tables once."""
+    with _services_lock:
+        service = _services.get(engine.url)
+        if service is None:
+            create_booking_tables(engine)
+            service = BookingService(engine)
+            _services[engine.url] = service
+    return service
@@ -0,0 +1,180 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Columns of redbus_details as scraped
+EXPECTED_COLUMNS = [
+    'route_name', 'route_link', 'bus_name', 'bus_type', 'departing_time',
+    'duration', 'reaching_time', 'star_rating', 'price', 'seats_available',
+]
+
+# Repeated free-text columns stored as dictionary-encoded categoricals
+CATEGORY_COLUMNS = ['route_name', 'route_link', 'bus_name', 'bus_type']
+
+# Time columns stored as minutes since midnight, -1 when unparseable
+CLOCK_COLUMNS = ['departing_time', 'reaching_time']
+
+MISSING = -1
+
+INT16_MAX = np.iinfo(np.int16).max
+
+
+def _to_int16(values, upper=INT16_MAX):
+    """Cast parsed numbers to int16, with anything above ``upper`` or unparsed as MISSING."""
+    values = values.where(values <= upper)
+    return values.fillna(MISSING).astype(np.int16).to_numpy()
+
+
+def parse_clock(values):
+    """Parse "HH:MM" strings into minutes since midnight, MISSING for times outside a day."""
+    parts = pd.Series(values, dtype=object).astype(str).str.extract(r'(\d{1,2}):(\d{2})')
+    minutes = pd.to_numeric(parts[0]) * 60 + pd.to_numeric(parts[1])
+    return _to_int16(minutes, upper=24 * 60 - 1)
+
+
+def parse_duration(values):
+    """Parse "05h 30m" style durations into minutes, MISSING for ones too long to store."""
+    text = pd.Series(values, dtype=object).astype(str)
+    hours = pd.to_numeric(text.str.extract(r'(\d+)\s*h', expand=False))
+    minutes = pd.to_numeric(text.str.extract(r'(\d+)\s*m', expand=False))
+    total = hours.fillna(0) * 60 + minutes.fillna(0)
+    total[hours.isna() & minutes.isna()] = np.nan
+    return _to_int16(total)
+
+
+def parse_seats(values):
+    """Parse "23 Seats available" or "23" into a seat count, capped at what int16 holds."""
+    seats = pd.to_numeric(pd.Series(values, dtype=object).astype(str).str.extract(r'(\d+)', expand=False))
+    return seats.fillna(0).clip(upper=INT16_MAX).astype(np.int16).to_numpy()
+
+
+def format_clock(minutes):
+    """Format minutes since midnight back to "HH:MM"."""
+    if minutes is None or minutes < 0:
+        return "-"
+    return f"{int(minutes) // 60:02d}:{int(minutes) % 60:02d}"
+
+
+def format_duration(minutes):
+    """Format minutes back to the "05h 30m" style shown by redBus."""
+    if minutes is None or minutes < 0:
+        return "-"
+    return f"{int(minutes) // 60:02d}h {int(minutes) % 60:02d}m"
+
+
+def normalize_bus_data(df):
+    """Return a compact, typed copy of redbus_details rows.
+
+    Times become minutes since midnight, durations minutes and seat counts
+    integers; repeated strings become categoricals. Only the columns present
+    in ``df`` are converted.
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORY_COLUMNS:
+            out[col] = values.astype('category')
+        elif col in CLOCK_COLUMNS:
+            out[col] = parse_clock(values)
+        elif col == 'duration':
+            out[col] = parse_duration(values)
+        elif col == 'seats_available':
+            out[col] = parse_seats(values)
+        elif col in ('star_rating', 'price'):
+            out[col] = pd.to_numeric(values, errors='coerce').astype(np.float32).to_numpy()
+        elif col == 'ID':
+            out[col] = values.astype(np.int32).to_numpy()
+        else:
+            out[col] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def to_query_filters(filters):
+    """Convert filters on a normalized frame back to the scraped values stored in redbus_details."""
+    # Database drivers bind Python scalars, not the numpy ones a frame yields
+    out = {key: value.item() if isinstance(value, np.generic) else value for key, value in filters.items()}
+    for col in CLOCK_COLUMNS:
+        if out.get(col) is not None:
+            out[col] = format_clock(out[col])
+    if out.get('duration') is not None:
+        out['duration'] = format_duration(out['duration'])
+    return out
+
+
+def to_display(df):
+    """Format the integer time columns of a normalized frame back into readable strings."""
+    out = df.copy()
+    for col in CLOCK_COLUMNS:
+        if col in out:
+            out[col] = out[col].map(format_clock)
+    if 'duration' in out:
+        out['duration'] = out['duration'].map(format_duration)
+    return out
+
+
+def filter_buses(df, filters):
+    """Apply the exact filter chain of the bus details page to a normalized frame."""
+    mask = np.ones(len(df), dtype=bool)
+    for col in ('bus_type', 'departing_time', 'reaching_time', 'duration'):
+        if filters.get(col) is not None:
+            mask &= (df[col] == filters[col]).to_numpy()
+    if filters.get('min_price') is not None:
+        mask &= df['price'].to_numpy() >= filters['min_price']
+    if filters.get('max_price') is not None:
+        mask &= df['price'].to_numpy() <= filters['max_price']
+    if 'star_rating' in filters:
+        ratings = df['star_rating'].to_numpy()
+        rating = filters['star_rating']
+        if rating is None or pd.isna(rating):
+            mask &= np.isnan(ratings)
+        else:
+            mask &= np.isclose(ratings, rating, atol=0.05)
+    return df[mask]
+
+
+def _filter_raw(df, filters):
+    """The original object-column filter chain, used as the speedup baseline."""
+    return df[
+        (df['bus_type'] == filters['bus_type']) &
+        (df['price'] >= filters['min_price']) &
+        (df['price'] <= filters['max_price']) &
+        (df['departing_time'] == filters['departing_time']) &
+        (df['reaching_time'] == filters['reaching_time']) &
+        (df['duration'] == filters['duration']) &
+        (df['star_rating'] == filters['star_rating'])
+    ]
+
+
+def _time_filter(func, df, filters, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(df, filters)
+    return (time.perf_counter() - start) / repeat
+
+
+def normalization_report(raw, normalized, repeat=20):
+    """Report the memory saved and the filter speedup of a normalized frame."""
+    raw_bytes = int(raw.memory_usage(deep=True).sum())
+    normalized_bytes = int(normalized.memory_usage(deep=True).sum())
+    report = {
+        'rows': len(raw),
+        'raw_bytes': raw_bytes,
+        'normalized_bytes': normalized_bytes,
+        'memory_ratio': raw_bytes / normalized_bytes if normalized_bytes else 0.0,
+    }
+    if len(raw) and all(col in raw for col in EXPECTED_COLUMNS[3:9]):
+        first = raw.iloc[0]
+        raw_filters = {col: first[col] for col in ('bus_type', 'departing_time', 'reaching_time', 'duration', 'star_rating')}
+        raw_filters.update(min_price=first['price'], max_price=first['price'])
+        typed = normalized.iloc[0]
+        typed_filters = {col: typed[col] for col in ('bus_type', 'departing_time', 'reaching_time', 'duration', 'star_rating')}
+        typed_filters.update(min_price=typed['price'], max_price=typed['price'])
+        raw_seconds = _time_filter(_filter_raw, raw, raw_filters, repeat)
+        typed_seconds = _time_filter(filter_buses, normalized, typed_filters, repeat)
+        report.update(
+            raw_filter_ms=raw_seconds * 1000,
+            normalized_filter_ms=typed_seconds * 1000,
+            filter_speedup=raw_seconds / typed_seconds if typed_seconds else 0.0,
+        )
+    return report
@@ -0,0 +1,161 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Facets offered by the bus details page, in the order the dropdowns narrow each other
+FACET_ORDER = ['bus_type', 'price', 'departing_time', 'reaching_time', 'duration', 'star_rating']
+
+# Facets answered from per-value bitmaps; price is a range answered from a sorted array
+VALUE_FACETS = ['bus_type', 'departing_time', 'reaching_time', 'duration', 'star_rating']
+
+# Number of route indexes kept in memory per process
+MAX_ROUTES = 64
+
+# Number of set bits in every byte value, for counting packed bitmaps
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+# Marks a selection whose answer is not memoized yet (None is a valid answer)
+_UNSET = object()
+
+
+def _key(facet, value):
+    """Canonical, hashable form of a facet value."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if facet == 'star_rating':
+        return round(float(value), 1)
+    if facet in ('departing_time', 'reaching_time', 'duration'):
+        return int(value)
+    return str(value)
+
+
+def _sort_key(facet, value):
+    # Ratings best first; everything else ascending, so times are chronological
+    if value is None:
+        return (1, 0)
+    return (0, -value if facet == 'star_rating' else value)
+
+
+class RouteFacets:
+    """Precomputed facet bitmaps for the buses of one route.
+
+    Every distinct value of a facet owns a packed bitmap of the rows holding it,
+    so the valid options given earlier selections are a bitwise AND plus a
+    popcount, never a rescan of the frame. Answers are memoized per selection.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.size = len(frame)
+        self._all = np.packbits(np.ones(self.size, dtype=bool))
+        self._values = {}
+        self._positions = {}
+        self._bitmaps = {}
+        for facet in VALUE_FACETS:
+            if facet in frame:
+                self._index_values(facet, frame[facet].to_numpy(dtype=object))
+        prices = frame['price'].to_numpy(dtype=np.float64) if 'price' in frame else np.full(self.size, np.nan)
+        self._price_order = np.argsort(prices, kind='stable')
+        self._sorted_prices = prices[self._price_order]
+        self._memo = {}
+
+    def _index_values(self, facet, raw):
+        keys = [_key(facet, value) for value in raw]
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object), use_na_sentinel=False)
+        uniques = [_key(facet, value) for value in uniques]
+        order = sorted(range(len(uniques)), key=lambda i: _sort_key(facet, uniques[i]))
+        bitmaps = np.empty((len(uniques), len(self._all)), dtype=np.uint8)
+        for row, code in enumerate(order):
+            bitmaps[row] = np.packbits(codes == code)
+        self._values[facet] = [uniques[i] for i in order]
+        self._positions[facet] = {uniques[i]: row for row, i in enumerate(order)}
+        self._bitmaps[facet] = bitmaps
+
+    def _price_bitmap(self, price_range):
+        low, high = price_range
+        start = np.searchsorted(self._sorted_prices, low, side='left')
+        stop = np.searchsorted(self._sorted_prices, high, side='right')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self._price_order[start:stop]] = True
+        return np.packbits(mask)
+
+    def _mask(self, selections):
+        mask = self._all
+        for facet, value in selections:
+            if facet == 'price':
+                mask = mask & self._price_bitmap(value)
+            elif facet in self._positions:
+                row = self._positions[facet].get(value)
+                if row is None:
+                    return np.zeros_like(self._all)
+                mask = mask & self._bitmaps[facet][row]
+        return mask
+
+    @staticmethod
+    def _selection_key(selections):
+        items = []
+        for facet, value in (selections or {}).items():
+            if facet == 'price':
+                items.append((facet, (float(value[0]), float(value[1]))))
+            else:
+                items.append((facet, _key(facet, value)))
+        return tuple(items)
+
+    def _memoized(self, name, selections, compute):
+        # Sessions share the index across threads, so never re-read the memo after storing
+        key = (name, self._selection_key(selections))
+        value = self._memo.get(key, _UNSET)
+        if value is _UNSET:
+            value = compute(self._mask(key[1]))
+            if len(self._memo) > 4096:
+                self._memo.clear()
+            self._memo[key] = value
+        return value
+
+    def options(self, facet, selections=None):
+        """Valid ``(value, count)`` pairs of a facet given the selections made so far."""
+        def compute(mask):
+            if facet not in self._bitmaps:
+                return []
+            counts = _POPCOUNT[self._bitmaps[facet] & mask].sum(axis=1)
+            return [(value, int(count)) for value, count in zip(self._values[facet], counts) if count]
+        return self._memoized(('options', facet), selections, compute)
+
+    def price_bounds(self, selections=None):
+        """Lowest and highest price among the rows matching the selections, or None."""
+        def compute(mask):
+            prices = self._sorted_prices[np.unpackbits(mask, count=self.size)[self._price_order].astype(bool)]
+            prices = prices[~np.isnan(prices)]
+            return (float(prices[0]), float(prices[-1])) if len(prices) else None
+        return self._memoized('price_bounds', selections, compute)
+
+    def rows(self, selections=None):
+        """The rows of the route matching every selection."""
+        positions = self._memoized('rows', selections, lambda mask: np.flatnonzero(np.unpackbits(mask, count=self.size)))
+        return self.frame.iloc[positions]
+
+
+_route_facets = OrderedDict()
+_route_lock = threading.Lock()
+
+
+def get_route_facets(route_name, frame, version):
+    """Return the facet index of a route, building it once per data version.
+
+    ``version`` identifies the data ``frame`` came from; the index keeps a
+    reference to the frame, so an object id is a valid version while cached.
+    """
+    key = (route_name, version)
+    with _route_lock:
+        facets = _route_facets.get(key)
+        if facets is not None:
+            _route_facets.move_to_end(key)
+            return facets
+    facets = RouteFacets(frame)
+    with _route_lock:
+        _route_facets[key] = facets
+        while len(_route_facets) > MAX_ROUTES:
+            _route_facets.popitem(last=False)
+    return facets
@@ -0,0 +1,405 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from redbus_booking import reconcile_inventory
+from redbus_data import EXPECTED_COLUMNS
+from redbus_db import DB_URL, dispose_engines, get_engine
+from redbus_migrations import (NATURAL_KEY, create_indexes, create_table, drop_table, id_high_water,
+                               reserve_ids, swap_tables)
+from redbus_versions import (confirm_pending, create_changes_table, current_version, discard_pending,
+                             pending_routes, record_changes, record_pending)
+
+# Per-operator files written by the scraping notebook
+OPERATOR_FILES = [
+    "apsrtc.csv", "astc.csv", "hrtc.csv", "ksrtc.csv", "ktcl.csv",
+    "rsrst.csv", "sbstc.csv", "tsrtc.csv", "upsrtc.csv", "wbtc.csv",
+]
+
+# Columns written by a load; source names the operator file each row came from
+LOAD_COLUMNS = EXPECTED_COLUMNS + ["source"]
+
+FAILED_DIR = "failed_batches"
+
+# Lists, inside the failed directory, the files a load could not read in full
+UNREAD_FILES = "unread_files.txt"
+
+# A refresh loads into the staging table, builds the shadow table and swaps it in
+LIVE_TABLE = "redbus_details"
+STAGING_TABLE = "redbus_details_staging"
+SHADOW_TABLE = "redbus_details_shadow"
+
+_queue = None
+
+
+def _init_worker(queue):
+    global _queue
+    _queue = queue
+
+
+def clean_chunk(df):
+    """Validate and tidy one chunk of scraped rows, dropping duplicates on the natural key."""
+    df.columns = df.columns.str.strip()
+    missing_columns = [col for col in EXPECTED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {missing_columns}")
+    df = df[EXPECTED_COLUMNS].dropna(subset=list(NATURAL_KEY))
+    df = df.assign(
+        star_rating=pd.to_numeric(df["star_rating"], errors="coerce"),
+        price=pd.to_numeric(df["price"], errors="coerce"),
+    )
+    df = df.drop_duplicates(subset=list(NATURAL_KEY), keep="last")
+    return df.astype(object).where(df.notna(), None)
+
+
+def parse_file(path, chunksize):
+    """Worker task: stream one operator file into the shared queue in fixed-size chunks."""
+    source = os.path.splitext(os.path.basename(path))[0]
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            _queue.put((path, clean_chunk(chunk).assign(source=source).to_dict("records"), None))
+    except Exception as e:
+        _queue.put((path, None, f"{type(e).__name__}: {e}"))
+    finally:
+        _queue.put((path, None, None))
+
+
+def upsert_statement(dialect, table="redbus_details"):
+    """Build an INSERT that updates the existing row when the natural key already exists."""
+    columns = ", ".join(LOAD_COLUMNS)
+    values = ", ".join(f":{col}" for col in LOAD_COLUMNS)
+    updates = [col for col in LOAD_COLUMNS if col not in NATURAL_KEY]
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({values})"
+    if dialect == "mysql":
+        sql += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{col} = VALUES({col})" for col in updates)
+    else:
+        sql += (f" ON CONFLICT ({', '.join(NATURAL_KEY)}) DO UPDATE SET "
+                + ", ".join(f"{col} = excluded.{col}" for col in updates))
+    return text(sql)
+
+
+def load_batch(engine, records, method="upsert", table="redbus_details"):
+    """Load one batch in its own transaction."""
+    with engine.begin() as conn:
+        if method == "load-data":
+            # REPLACE keeps the natural key unique, but re-inserts replaced rows under new IDs,
+            # so main only loads the staging table this way
+            with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8") as f:
+                pd.DataFrame(records, columns=LOAD_COLUMNS).to_csv(f, index=False, header=False, na_rep="\\N")
+            try:
+                path = f.name.replace("\\", "/")
+                conn.exec_driver_sql(
+                    f"LOAD DATA LOCAL INFILE '{path}' REPLACE INTO TABLE {table} "
+                    "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    f"LINES TERMINATED BY '\\n' ({', '.join(LOAD_COLUMNS)})"
+                )
+            finally:
+                os.remove(f.name)
+        else:
+            conn.execute(upsert_statement(engine.dialect.name, table), records)
+
+
+def spill_batch(records, failed_dir, batch_number):
+    """Save a batch that could not be loaded so it can be retried on its own."""
+    os.makedirs(failed_dir, exist_ok=True)
+    path = os.path.join(failed_dir, f"batch-{int(time.time())}-{batch_number:05d}.csv")
+    pd.DataFrame(records, columns=LOAD_COLUMNS).to_csv(path, index=False)
+    return path
+
+
+class Loader:
+    """Collects streamed rows into batches and loads each with retries."""
+
+    def __init__(self, engine, batch_size=5000, method="upsert", retries=3, failed_dir=FAILED_DIR, table=LIVE_TABLE):
+        self.engine = engine
+        self.table = table
+        self.batch_size = batch_size
+        self.method = method
+        self.retries = retries
+        self.failed_dir = failed_dir
+        self.pending = []
+        self.loaded = 0
+        self.failed = 0
+        self.batches = 0
+        self.routes = set()
+
+    def add(self, records):
+        self.pending.extend(records)
+        while len(self.pending) >= self.batch_size:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            self.flush(batch)
+
+    def flush(self, batch=None, spill=True):
+        """Load one batch (by default whatever is pending), spilling it to disk if every attempt fails."""
+        if batch is None:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return True
+        self.batches += 1
+        for attempt in range(1, self.retries + 1):
+            try:
+                load_batch(self.engine, batch, self.method, self.table)
+                self.loaded += len(batch)
+                self.routes.update(record["route_name"] for record in batch)
+                return True
+            except SQLAlchemyError as e:
+                print(f"Batch {self.batches} failed (attempt {attempt}/{self.retries}): {e}")
+                time.sleep(min(2 ** attempt, 30))
+        self.failed += len(batch)
+        if not spill:
+            return False
+        path = spill_batch(batch, self.failed_dir, self.batches)
+        print(f"Saved failed batch to {path}; rerun with --retry-failed to load it.")
+        return False
+
+
+def ingest_files(paths, loader, workers=None, chunksize=5000, queue_size=8, poll_interval=1.0):
+    """Parse the files in worker processes and stream their chunks into the loader.
+
+    The bounded queue keeps at most ``queue_size`` chunks in memory at a time.
+    Returns the elapsed seconds and the files that could not be read in full,
+    including those whose worker died before finishing them.
+    """
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    queue = multiprocessing.Queue(maxsize=queue_size)
+    start = time.perf_counter()
+    failed = []
+    # Forked workers must not inherit the parent's open database connections
+    dispose_engines()
+    loader.engine.dispose()
+    # Unlike multiprocessing.Pool, the executor fails the pending tasks of a worker that is killed
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(queue,)) as pool:
+        tasks = {path: pool.submit(parse_file, path, chunksize) for path in paths}
+        remaining = set(paths)
+        while remaining:
+            try:
+                path, records, error = queue.get(timeout=poll_interval)
+            except Empty:
+                for path in sorted(remaining):
+                    task = tasks[path]
+                    if task.done() and task.exception() is not None:
+                        remaining.discard(path)
+                        failed.append(path)
+                        print(f"Error reading {path}: worker stopped ({type(task.exception()).__name__})")
+                continue
+            if path not in remaining:
+                continue
+            if records is not None:
+                loader.add(records)
+            elif error is not None:
+                failed.append(path)
+                print(f"Error reading {path}: {error}")
+            else:
+                remaining.discard(path)
+                print(f"Finished {path}")
+    loader.flush()
+    return time.perf_counter() - start, failed
+
+
+def save_unread_files(paths, failed_dir=FAILED_DIR):
+    """Record the files a load could not read, so a later --retry-failed run knows about them."""
+    os.makedirs(failed_dir, exist_ok=True)
+    with open(os.path.join(failed_dir, UNREAD_FILES), "w", encoding="utf-8") as f:
+        f.writelines(f"{path}\n" for path in paths)
+
+
+def unread_files(failed_dir=FAILED_DIR):
+    """The files an earlier load could not read, as saved by save_unread_files."""
+    try:
+        with open(os.path.join(failed_dir, UNREAD_FILES), encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def retry_failed(loader, failed_dir=FAILED_DIR):
+    """Reload previously spilled batches, deleting each file once it loads."""
+    start = time.perf_counter()
+    for path in sorted(glob.glob(os.path.join(failed_dir, "*.csv"))):
+        df = pd.read_csv(path).reindex(columns=LOAD_COLUMNS)
+        records = df.astype(object).where(df.notna(), None).to_dict("records")
+        if loader.flush(records, spill=False):
+            os.remove(path)
+            print(f"Reloaded {path}")
+    return time.perf_counter() - start
+
+
+def _index_suffix(engine, tag):
+    # SQLite index names are global to the database, MySQL ones are per table
+    return f"_{tag}" if engine.dialect.name == "sqlite" else ""
+
+
+def build_shadow(engine, version):
+    """Build the next version of the table from the live rows and the staged ones.
+
+    A load replaces everything earlier loads took from the same operator
+    files: their buses that disappeared from the re-scrape are dropped, while
+    rows from other files, including other operators on the same routes, are
+    copied as they are. Rows loaded before sources were recorded are kept
+    unless re-scraped. Buses already listed keep their IDs, and new buses get
+    IDs above any the live table ever handed out, so a dropped bus's ID (and
+    its seats and bookings) never passes to another bus. Returns the routes
+    whose rows changed.
+    """
+    drop_table(engine, SHADOW_TABLE)
+    create_table(engine, SHADOW_TABLE)
+    create_indexes(engine, SHADOW_TABLE, _index_suffix(engine, f"v{version}"))
+    columns = ", ".join(LOAD_COLUMNS)
+    staged = ", ".join(f"s.{col}" for col in LOAD_COLUMNS)
+    join = " AND ".join(f"l.{col} = s.{col}" for col in NATURAL_KEY)
+    replaced = f"l.source IN (SELECT DISTINCT source FROM {STAGING_TABLE} WHERE source IS NOT NULL)"
+    with engine.begin() as conn:
+        reserve_ids(conn, SHADOW_TABLE, id_high_water(conn, LIVE_TABLE))
+    with engine.begin() as conn:
+        routes = {row[0] for row in conn.execute(text(
+            f"SELECT DISTINCT route_name FROM {STAGING_TABLE} "
+            f"UNION SELECT DISTINCT l.route_name FROM {LIVE_TABLE} l WHERE {replaced}"
+        ))}
+        conn.execute(text(
+            f"INSERT INTO {SHADOW_TABLE} (ID, {columns}) SELECT l.ID, {', '.join(f'l.{col}' for col in LOAD_COLUMNS)} "
+            f"FROM {LIVE_TABLE} l WHERE (l.source IS NULL OR NOT {replaced}) "
+            f"AND NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} s WHERE {join})"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {SHADOW_TABLE} (ID, {columns}) SELECT l.ID, {staged} "
+            f"FROM {STAGING_TABLE} s JOIN {LIVE_TABLE} l ON {join}"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {SHADOW_TABLE} ({columns}) SELECT {staged} "
+            f"FROM {STAGING_TABLE} s LEFT JOIN {LIVE_TABLE} l ON {join} WHERE l.ID IS NULL"
+        ))
+    return routes
+
+
+def recover_publish(engine):
+    """Finish versioning a swap that a crash interrupted; return the version published, or None.
+
+    The changed routes are recorded as pending before the swap. If the shadow
+    table is gone, the swap went through and the routes are logged under a new
+    version; otherwise it never happened and they are forgotten.
+    """
+    with engine.begin() as conn:
+        routes = pending_routes(conn)
+        if not routes:
+            return None
+        if inspect(conn).has_table(SHADOW_TABLE):
+            discard_pending(conn)
+            return None
+        version = confirm_pending(conn)
+    reconcile_inventory(engine, routes)
+    return version
+
+
+def publish(engine):
+    """Swap the staged load into the live table and record the changed routes under a new version.
+
+    The seat inventory of those routes is then refreshed from the new seat counts.
+    """
+    recover_publish(engine)
+    with engine.connect() as conn:
+        version = current_version(conn) + 1
+    routes = build_shadow(engine, version)
+    with engine.begin() as conn:
+        record_pending(conn, version, routes)
+    swap_tables(engine, LIVE_TABLE, SHADOW_TABLE, after_swap=confirm_pending)
+    drop_table(engine, STAGING_TABLE)
+    reconcile_inventory(engine, routes)
+    return version, routes
+
+
+def main():
+    """Load the per-operator CSV files into redbus_details."""
+    parser = argparse.ArgumentParser(description="Stream the scraped operator CSVs into MySQL.")
+    parser.add_argument("files", nargs="*", default=OPERATOR_FILES, help="CSV files to load (defaults to the ten operator files)")
+    parser.add_argument("--db-url", default=DB_URL, help="SQLAlchemy URL (defaults to REDBUS_DB_URL)")
+    parser.add_argument("--workers", type=int, help="parser processes (defaults to one per file, up to the CPU count)")
+    parser.add_argument("--chunksize", type=int, default=5000, help="rows read from a file at a time")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per transaction")
+    parser.add_argument("--method", choices=["upsert", "load-data"], default="upsert",
+                        help="batched upserts, or LOAD DATA LOCAL INFILE (MySQL only)")
+    parser.add_argument("--retries", type=int, default=3, help="attempts per batch before it is saved for later")
+    parser.add_argument("--failed-dir", default=FAILED_DIR, help="where batches that could not be loaded are saved")
+    parser.add_argument("--retry-failed", action="store_true", help="only reload the batches saved in --failed-dir")
+    parser.add_argument("--in-place", action="store_true",
+                        help="upsert straight into the live table instead of staging and swapping it atomically")
+    args = parser.parse_args()
+    if args.method == "load-data" and args.in_place:
+        parser.error("--method load-data replaces rows under new IDs, so it cannot load the live table; drop --in-place")
+
+    if args.method == "load-data":
+        engine = create_engine(args.db_url, pool_pre_ping=True, connect_args={"allow_local_infile": True})
+    else:
+        engine = get_engine(args.db_url)
+    create_table(engine)
+    create_indexes(engine)
+    create_changes_table(engine)
+    recovered = recover_publish(engine)
+    if recovered:
+        print(f"Published data version {recovered} for a swap an earlier run did not finish")
+
+    table = LIVE_TABLE if args.in_place else STAGING_TABLE
+    if not args.retry_failed:
+        # A fresh load supersedes whatever an earlier, failed run left behind
+        shutil.rmtree(args.failed_dir, ignore_errors=True)
+        if not args.in_place:
+            drop_table(engine, STAGING_TABLE)
+    create_table(engine, table)
+    create_indexes(engine, table, _index_suffix(engine, "staging") if table == STAGING_TABLE else "")
+
+    loader = Loader(engine, args.batch_size, args.method, args.retries, args.failed_dir, table)
+    failed_files = []
+    if args.retry_failed:
+        elapsed = retry_failed(loader, args.failed_dir)
+        # Spilled batches can be retried, but a file that was never read in full cannot
+        failed_files = unread_files(args.failed_dir)
+    else:
+        paths = []
+        for path in args.files:
+            if os.path.exists(path):
+                paths.append(path)
+            else:
+                print(f"Skipping missing file {path}")
+        if not paths:
+            print("No data to insert.")
+            return
+        elapsed, failed_files = ingest_files(paths, loader, args.workers, args.chunksize)
+        if failed_files:
+            save_unread_files(failed_files, args.failed_dir)
+
+    rate = loader.loaded / elapsed if elapsed else 0.0
+    print(f"Loaded {loader.loaded} rows in {loader.batches} batches, {elapsed:.1f}s ({rate:,.0f} rows/sec)")
+    if args.in_place and loader.routes:
+        # Batches that did load are already visible, so announce them even if others failed
+        with engine.begin() as conn:
+            version = current_version(conn) + 1
+            record_changes(conn, version, loader.routes)
+        reconcile_inventory(engine, loader.routes)
+        print(f"Published data version {version} ({len(loader.routes)} routes changed)")
+    if loader.failed:
+        print(f"{loader.failed} rows failed and were saved to {args.failed_dir}")
+        if not args.in_place:
+            print("The new data was not published; rerun with --retry-failed to finish the load.")
+        return
+    if failed_files:
+        print(f"Could not read {len(failed_files)} files: {', '.join(failed_files)}")
+        if not args.in_place:
+            # Publishing part of a file would drop the buses that were never read
+            print("The new data was not published; load the files again once every one can be read.")
+        return
+    if not args.in_place:
+        version, routes = publish(engine)
+        print(f"Published data version {version} ({len(routes)} routes changed)")
+
+
+if __name__ == "__main__":
+    main()
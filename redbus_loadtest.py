@@ -0,0 +1,127 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, func, insert, select
+
+from redbus_booking import (CONFIRMED, BookingService, bookings, create_booking_tables,
+                            new_idempotency_key, seat_inventory)
+
+
+def seed_inventory(engine, buses, seats):
+    """Give every test bus the same number of seats."""
+    create_booking_tables(engine)
+    with engine.begin() as conn:
+        conn.execute(seat_inventory.delete())
+        conn.execute(bookings.delete())
+        conn.execute(insert(seat_inventory), [
+            {"bus_id": bus_id, "seats_available": seats, "version": 0} for bus_id in range(1, buses + 1)
+        ])
+
+
+def run_bookers(services, bookers, requests_per_booker, buses, max_seats, resubmit_rate, seed):
+    """Run concurrent bookers against the services; return per-request latencies and outcomes."""
+    latencies, outcomes = [], []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(bookers)
+
+    def booker(number):
+        rng = random.Random(seed + number)
+        service = services[number % len(services)]
+        start_gate.wait()
+        for _ in range(requests_per_booker):
+            request = {
+                "idempotency_key": new_idempotency_key(),
+                "bus_id": rng.randint(1, buses),
+                "seats": rng.randint(1, max_seats),
+                "name": f"Booker {number}",
+                "email": f"booker{number}@example.com",
+                "phone": "0000000000",
+                "payment_method": "Credit Card",
+            }
+            attempts = 2 if rng.random() < resubmit_rate else 1
+            for _ in range(attempts):
+                began = time.perf_counter()
+                result = service.book(request)
+                elapsed = time.perf_counter() - began
+                with lock:
+                    latencies.append(elapsed)
+                    outcomes.append(result)
+
+    threads = [threading.Thread(target=booker, args=(number,)) for number in range(bookers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, outcomes
+
+
+def count_oversold(engine, seats):
+    """Seats sold beyond each bus's capacity, plus any inventory that went negative."""
+    with engine.connect() as conn:
+        sold = conn.execute(select(bookings.c.bus_id, func.sum(bookings.c.seats)).group_by(bookings.c.bus_id)).fetchall()
+        negative = conn.execute(
+            select(func.count()).select_from(seat_inventory).where(seat_inventory.c.seats_available < 0)
+        ).scalar()
+        mismatched = conn.execute(
+            select(func.count()).select_from(seat_inventory).where(
+                seat_inventory.c.seats_available != seats - func.coalesce(
+                    select(func.sum(bookings.c.seats)).where(bookings.c.bus_id == seat_inventory.c.bus_id)
+                    .scalar_subquery(), 0))
+        ).scalar()
+    oversold = sum(max(0, total - seats) for bus_id, total in sold)
+    return oversold + negative, mismatched
+
+
+def main():
+    """Simulate many concurrent bookers and report throughput, latency and overselling."""
+    parser = argparse.ArgumentParser(description="Load-test the booking service.")
+    parser.add_argument("--db-url", help="SQLAlchemy URL of a scratch database (defaults to a temporary SQLite file)")
+    parser.add_argument("--bookers", type=int, default=300, help="concurrent booking threads")
+    parser.add_argument("--requests", type=int, default=5, help="bookings per booker")
+    parser.add_argument("--buses", type=int, default=20, help="buses to book on")
+    parser.add_argument("--seats", type=int, default=40, help="seats per bus")
+    parser.add_argument("--max-seats", type=int, default=4, help="most seats in one booking")
+    parser.add_argument("--resubmit-rate", type=float, default=0.1, help="share of bookings submitted twice")
+    parser.add_argument("--services", type=int, default=2, help="booking services, as if run by separate app processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="bookings per transaction")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    db_url = args.db_url
+    if db_url is None:
+        db_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "loadtest.db").replace("\\", "/")
+    engine = create_engine(db_url, pool_size=args.services + 5, pool_pre_ping=True,
+                           connect_args={"timeout": 30} if db_url.startswith("sqlite") else {})
+    seed_inventory(engine, args.buses, args.seats)
+
+    services = [BookingService(engine, batch_size=args.batch_size) for _ in range(args.services)]
+    start = time.perf_counter()
+    latencies, outcomes = run_bookers(services, args.bookers, args.requests, args.buses,
+                                      args.max_seats, args.resubmit_rate, args.seed)
+    elapsed = time.perf_counter() - start
+
+    confirmed = sum(1 for result in outcomes if result["status"] == CONFIRMED and not result["replayed"])
+    replayed = sum(1 for result in outcomes if result.get("replayed"))
+    oversold, mismatched = count_oversold(engine, args.seats)
+    latencies = np.array(latencies) * 1000
+
+    print(f"Database:      {db_url}")
+    print(f"Requests:      {len(outcomes)} from {args.bookers} bookers in {elapsed:.2f}s "
+          f"({len(outcomes) / elapsed:,.0f} requests/sec)")
+    print(f"Confirmed:     {confirmed} ({confirmed / elapsed:,.0f} bookings/sec), "
+          f"{replayed} resubmits answered from their original booking")
+    print(f"Rejected:      {len(outcomes) - confirmed - replayed} (not enough seats)")
+    print(f"Latency:       p50 {np.percentile(latencies, 50):.1f} ms, p99 {np.percentile(latencies, 99):.1f} ms")
+    print(f"Oversold:      {oversold} seats")
+    print(f"Inventory drift: {mismatched} buses whose seat count disagrees with their bookings")
+    if oversold or mismatched:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
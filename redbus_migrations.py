@@ -0,0 +1,170 @@
+import argparse
+import re
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, inspect, text
+
+from redbus_db import get_engine
+
+# Columns that identify one scraped departure across re-scrapes
+NATURAL_KEY = ("route_link", "bus_name", "departing_time")
+
+# Secondary indexes on redbus_details, keyed by name
+INDEXES = {
+    "idx_route_type_price": ("route_name", "bus_type", "price"),
+    "idx_route_departing": ("route_name", "departing_time"),
+}
+
+# Unique indexes, keyed by name; upserts rely on uq_natural_key
+UNIQUE_INDEXES = {
+    "uq_natural_key": NATURAL_KEY,
+}
+
+
+def bus_details_table(name="redbus_details", metadata=None):
+    """Describe the redbus_details table, matching the CREATE TABLE in redbus_database.ipynb."""
+    return Table(
+        name, metadata or MetaData(),
+        Column("ID", Integer, primary_key=True, autoincrement=True),
+        Column("route_name", String(255), nullable=False),
+        Column("route_link", String(255), nullable=False),
+        Column("bus_name", String(255), nullable=False),
+        Column("bus_type", String(255), nullable=False),
+        Column("departing_time", String(255), nullable=False),
+        Column("duration", String(255), nullable=False),
+        Column("reaching_time", String(255), nullable=False),
+        Column("star_rating", Float, nullable=True),
+        Column("price", Float, nullable=True),
+        Column("seats_available", String(255), nullable=False),
+        # Operator file the row was last loaded from; NULL for rows inserted by the notebook
+        Column("source", String(64), nullable=True),
+        # Never reuse the ID of a deleted bus; seat inventory and bookings refer to it
+        sqlite_autoincrement=True,
+    )
+
+
+def create_table(engine, table="redbus_details"):
+    """Create the table if it does not exist yet, adding any columns it predates."""
+    described = bus_details_table(table)
+    described.create(engine, checkfirst=True)
+    existing = {column["name"] for column in inspect(engine).get_columns(table)}
+    missing = [column for column in described.columns if column.name not in existing]
+    if missing:
+        with engine.begin() as conn:
+            for column in missing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(engine.dialect)} NULL"))
+
+
+def remove_duplicates(conn, table="redbus_details"):
+    """Keep only the newest row per natural key so the unique index can be built."""
+    key = ", ".join(NATURAL_KEY)
+    # The derived table lets MySQL delete from the table it is selecting from
+    result = conn.execute(text(
+        f"DELETE FROM {table} WHERE ID NOT IN "
+        f"(SELECT keep_id FROM (SELECT MAX(ID) AS keep_id FROM {table} GROUP BY {key}) AS keep)"
+    ))
+    return result.rowcount
+
+
+def create_indexes(engine, table="redbus_details", suffix=""):
+    """Add any missing secondary and unique indexes to the table; safe to run repeatedly.
+
+    Indexes are matched by their columns, so tables renamed by swap_tables()
+    keep theirs. ``suffix`` is appended to new index names, which SQLite
+    requires to be unique across the whole database.
+    """
+    existing = {tuple(index["column_names"]) for index in inspect(engine).get_indexes(table)}
+    created = []
+    with engine.begin() as conn:
+        for name, columns in INDEXES.items():
+            if columns in existing:
+                continue
+            conn.execute(text(f"CREATE INDEX {name}{suffix} ON {table} ({', '.join(columns)})"))
+            created.append(name + suffix)
+        for name, columns in UNIQUE_INDEXES.items():
+            if columns in existing:
+                continue
+            removed = remove_duplicates(conn, table)
+            if removed:
+                print(f"Removed {removed} duplicate rows from {table}")
+            conn.execute(text(f"CREATE UNIQUE INDEX {name}{suffix} ON {table} ({', '.join(columns)})"))
+            created.append(name + suffix)
+    return created
+
+
+def drop_table(engine, table):
+    """Drop a table if it exists."""
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+def id_high_water(conn, table):
+    """Highest ID the table has handed out, counting deleted rows where the database remembers them."""
+    highest = conn.execute(text(f"SELECT COALESCE(MAX(ID), 0) FROM {table}")).scalar()
+    if conn.dialect.name == "mysql":
+        # SHOW CREATE TABLE reports the live counter; information_schema may serve a cached one
+        created = conn.execute(text(f"SHOW CREATE TABLE {table}")).fetchone()[1]
+        match = re.search(r"AUTO_INCREMENT=(\d+)", created)
+        if match:
+            highest = max(highest, int(match.group(1)) - 1)
+    elif conn.dialect.name == "sqlite" and inspect(conn).has_table("sqlite_sequence"):
+        seq = conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = :name"), {"name": table}).scalar()
+        highest = max(highest, seq or 0)
+    return highest
+
+
+def reserve_ids(conn, table, high_water):
+    """Make the table hand out new IDs above ``high_water`` only."""
+    if conn.dialect.name == "mysql":
+        # DDL commits implicitly, so run this before the table is filled
+        conn.execute(text(f"ALTER TABLE {table} AUTO_INCREMENT = {int(high_water) + 1}"))
+    elif conn.dialect.name == "sqlite":
+        params = {"name": table, "seq": int(high_water)}
+        updated = conn.execute(text("UPDATE sqlite_sequence SET seq = MAX(seq, :seq) WHERE name = :name"), params)
+        if not updated.rowcount:
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), params)
+
+
+def swap_tables(engine, live, shadow, after_swap=None):
+    """Atomically replace ``live`` with ``shadow`` and drop the old table.
+
+    ``after_swap(conn)`` runs once the new table is visible, e.g. to bump the data version.
+    """
+    retired = f"{live}_old"
+    drop_table(engine, retired)
+    if engine.dialect.name == "mysql":
+        # RENAME TABLE swaps both names in one atomic step; it commits implicitly
+        with engine.begin() as conn:
+            conn.execute(text(f"RENAME TABLE {live} TO {retired}, {shadow} TO {live}"))
+        with engine.begin() as conn:
+            if after_swap:
+                after_swap(conn)
+            conn.execute(text(f"DROP TABLE {retired}"))
+    else:
+        # SQLite DDL is transactional, but pysqlite only opens transactions for DML
+        with engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN")
+            conn.execute(text(f"ALTER TABLE {live} RENAME TO {retired}"))
+            conn.execute(text(f"ALTER TABLE {shadow} RENAME TO {live}"))
+            if after_swap:
+                after_swap(conn)
+            conn.execute(text(f"DROP TABLE {retired}"))
+            conn.commit()
+
+
+def main():
+    """Apply the index migration to the configured database."""
+    parser = argparse.ArgumentParser(description="Create redbus_details and add its indexes.")
+    parser.add_argument("--db-url", help="SQLAlchemy URL (defaults to REDBUS_DB_URL)")
+    args = parser.parse_args()
+
+    engine = get_engine(args.db_url)
+    create_table(engine)
+    created = create_indexes(engine)
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+    else:
+        print("All indexes already exist.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import numpy as np
+
+from redbus_data import MISSING
+
+MINUTES_PER_DAY = 24 * 60
+
+# Penalty per unit of distance on each criterion; a score of 0 is an exact match
+DEFAULT_WEIGHTS = {
+    'bus_type': 120.0,      # flat penalty for a different seat type
+    'departing_time': 1.0,  # per minute away from the selected departure
+    'reaching_time': 0.5,   # per minute away from the selected arrival
+    'duration': 0.5,        # per minute longer or shorter
+    'price': 0.25,          # per rupee outside the selected price band
+    'star_rating': 40.0,    # per star below or above the selected rating
+}
+
+# Distance used when a row has no parseable value for a criterion
+MISSING_TIME_DISTANCE = MINUTES_PER_DAY // 2
+MISSING_RATING_GAP = 5.0
+
+
+def _clock_distance(values, targets):
+    """Minutes between clock times, wrapping around midnight."""
+    diff = np.abs(values[None, :] - targets[:, None]) % MINUTES_PER_DAY
+    diff = np.minimum(diff, MINUTES_PER_DAY - diff).astype(np.float64)
+    diff[np.broadcast_to(values[None, :] == MISSING, diff.shape)] = MISSING_TIME_DISTANCE
+    return diff
+
+
+def _criteria_column(criteria_list, key, dtype=np.float64):
+    return np.array([np.nan if c.get(key) is None else c[key] for c in criteria_list], dtype=dtype)
+
+
+def score_matrix(df, criteria_list, weights=None):
+    """Score every row of a normalized frame against many criteria sets at once.
+
+    Returns an array of shape ``(len(criteria_list), len(df))``; lower is closer.
+    Criteria missing from a set do not contribute to its scores.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    scores = np.zeros((len(criteria_list), len(df)))
+
+    if 'bus_type' in df:
+        bus_types = df['bus_type'].to_numpy(dtype=object)
+        for i, criteria in enumerate(criteria_list):
+            if criteria.get('bus_type') is not None:
+                scores[i] += weights['bus_type'] * (bus_types != criteria['bus_type'])
+
+    for col in ('departing_time', 'reaching_time'):
+        targets = _criteria_column(criteria_list, col)
+        if col in df and not np.isnan(targets).all():
+            distance = _clock_distance(df[col].to_numpy(dtype=np.int64), np.nan_to_num(targets).astype(np.int64))
+            distance[np.isnan(targets)] = 0
+            scores += weights[col] * distance
+
+    targets = _criteria_column(criteria_list, 'duration')
+    if 'duration' in df and not np.isnan(targets).all():
+        durations = df['duration'].to_numpy(dtype=np.float64)
+        distance = np.abs(durations[None, :] - targets[:, None])
+        distance[np.broadcast_to(durations[None, :] == MISSING, distance.shape)] = MISSING_TIME_DISTANCE
+        scores += weights['duration'] * np.nan_to_num(distance)
+
+    if 'price' in df:
+        prices = df['price'].to_numpy(dtype=np.float64)
+        low = np.nan_to_num(_criteria_column(criteria_list, 'min_price'), nan=-np.inf)
+        high = np.nan_to_num(_criteria_column(criteria_list, 'max_price'), nan=np.inf)
+        outside = np.maximum(low[:, None] - prices[None, :], 0) + np.maximum(prices[None, :] - high[:, None], 0)
+        scores += weights['price'] * np.nan_to_num(outside)
+
+    targets = _criteria_column(criteria_list, 'star_rating')
+    if 'star_rating' in df and not np.isnan(targets).all():
+        ratings = df['star_rating'].to_numpy(dtype=np.float64)
+        gap = np.abs(ratings[None, :] - targets[:, None])
+        gap[np.broadcast_to(np.isnan(ratings)[None, :], gap.shape)] = MISSING_RATING_GAP
+        scores += weights['star_rating'] * np.nan_to_num(gap)
+
+    return scores
+
+
+def _top_k(scores, k):
+    """Positions of the k lowest scores in ascending order, without a full sort."""
+    if k < len(scores):
+        candidates = np.argpartition(scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(scores[candidates], kind='stable')]
+
+
+def rank_closest_matches_batch(df, criteria_list, k=10, weights=None):
+    """Return the k closest rows of ``df`` for each criteria set, with a ``match_score`` column."""
+    if df.empty or k <= 0:
+        return [df.iloc[0:0].assign(match_score=np.array([], dtype=np.float64)) for _ in criteria_list]
+    scores = score_matrix(df, criteria_list, weights)
+    results = []
+    for row_scores in scores:
+        top = _top_k(row_scores, k)
+        results.append(df.iloc[top].assign(match_score=row_scores[top]))
+    return results
+
+
+def rank_closest_matches(df, criteria, k=10, weights=None):
+    """Return the k rows of a normalized frame closest to the selected criteria.
+
+    The input frame is never modified; the result carries a ``match_score``
+    column where 0 means every criterion matched.
+    """
+    return rank_closest_matches_batch(df, [criteria], k, weights)[0]
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from redbus_data import EXPECTED_COLUMNS, normalize_bus_data
+from redbus_db import get_engine, run_query
+from redbus_versions import current_version
+
+# Where snapshots live and whether the app reads them before the database
+SNAPSHOT_DIR = os.environ.get("REDBUS_SNAPSHOT_DIR", "snapshot")
+DATA_SOURCE = os.environ.get("REDBUS_DATA_SOURCE", "snapshot")  # "snapshot" or "db"
+
+# Bumped whenever the on-disk layout changes
+FORMAT_VERSION = 1
+
+# File naming the snapshot readers should open
+CURRENT_FILE = "CURRENT"
+
+
+class Snapshot:
+    """A read-only, memory-mapped snapshot of normalized redbus_details rows.
+
+    Rows are stored sorted by route, so each route is one contiguous slice.
+    """
+
+    def __init__(self, path, manifest, frame):
+        self.path = path
+        self.manifest = manifest
+        self.frame = frame
+        self.version = manifest["version"]
+        self.data_version = manifest.get("data_version")
+        self._routes = {route: tuple(bounds) for route, bounds in manifest["routes"].items()}
+
+    def routes(self):
+        """Route names in alphabetical order."""
+        return list(self._routes)
+
+    def route_rows(self, route_name, columns=None):
+        """The rows of one route, as a slice of the mapped columns."""
+        start, stop = self._routes.get(route_name, (0, 0))
+        rows = self.frame.iloc[start:stop]
+        return rows[[col for col in columns if col in rows]] if columns else rows
+
+
+def _next_version(directory):
+    versions = [int(name[1:]) for name in os.listdir(directory) if name.startswith("v") and name[1:].isdigit()]
+    return max(versions, default=0) + 1
+
+
+def export_snapshot(df, directory=SNAPSHOT_DIR, data_version=None, keep=3):
+    """Write normalized rows as a new snapshot version and make it current.
+
+    Each column becomes a ``.npy`` file (categoricals as integer codes, with the
+    categories in ``manifest.json``). The CURRENT pointer is swapped only after
+    every file is written, so readers never see a partial snapshot.
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = _next_version(directory)
+    path = os.path.join(directory, f"v{version}")
+    os.makedirs(path)
+
+    df = df.sort_values(["route_name", "departing_time"], kind="stable").reset_index(drop=True)
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(path, f"{col}.npy"), values.cat.codes.to_numpy())
+            columns[col] = {"kind": "category", "categories": [str(c) for c in values.cat.categories]}
+        else:
+            np.save(os.path.join(path, f"{col}.npy"), values.to_numpy())
+            columns[col] = {"kind": "array"}
+
+    codes = df["route_name"].cat.codes.to_numpy() if "route_name" in df else np.array([], dtype=np.int8)
+    categories = df["route_name"].cat.categories if "route_name" in df else []
+    starts = np.searchsorted(codes, np.arange(len(categories)), side="left")
+    stops = np.searchsorted(codes, np.arange(len(categories)), side="right")
+    routes = {str(name): [int(start), int(stop)] for name, start, stop in zip(categories, starts, stops) if stop > start}
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "data_version": data_version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": len(df),
+        "columns": columns,
+        "routes": routes,
+    }
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    pointer = os.path.join(directory, CURRENT_FILE)
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(f"v{version}")
+    os.replace(pointer + ".tmp", pointer)
+
+    for old in range(1, version - keep + 1):
+        shutil.rmtree(os.path.join(directory, f"v{old}"), ignore_errors=True)
+    return path
+
+
+def current_snapshot(directory=SNAPSHOT_DIR):
+    """Name of the snapshot version CURRENT points at, e.g. "v3"."""
+    with open(os.path.join(directory, CURRENT_FILE), encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def load_snapshot(directory=SNAPSHOT_DIR, version=None):
+    """Open a snapshot version (by default the current one) with every column memory-mapped.
+
+    Categorical columns wrap their mapped integer codes, so no column is read
+    into memory until it is used.
+    """
+    path = os.path.join(directory, version or current_snapshot(directory))
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format {manifest['format_version']}")
+
+    data = {}
+    for col, spec in manifest["columns"].items():
+        values = np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r")
+        if spec["kind"] == "category":
+            # The codes were written by export_snapshot, so skip the validation scan and keep them mapped
+            values = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(spec["categories"]), validate=False)
+        data[col] = values
+    return Snapshot(path, manifest, pd.DataFrame(data, copy=False))
+
+
+_open_snapshots = {}
+_open_lock = threading.Lock()
+
+
+def open_snapshot(directory=SNAPSHOT_DIR):
+    """Return the current snapshot, mapping it only once per version per process."""
+    current = current_snapshot(directory)
+    key = (os.path.abspath(directory), current)
+    with _open_lock:
+        snapshot = _open_snapshots.get(key)
+        if snapshot is None:
+            snapshot = load_snapshot(directory, current)
+            _open_snapshots.clear()
+            _open_snapshots[key] = snapshot
+    return snapshot
+
+
+def main():
+    """Export redbus_details from the database to a local snapshot."""
+    parser = argparse.ArgumentParser(description="Export redbus_details to a memory-mappable snapshot.")
+    parser.add_argument("--db-url", help="SQLAlchemy URL (defaults to REDBUS_DB_URL)")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--keep", type=int, default=3, help="number of snapshot versions to keep")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = get_engine(args.db_url)
+    # Read the version first, so a load published meanwhile is never labelled as included
+    with engine.connect() as conn:
+        data_version = current_version(conn)
+    df = run_query(f"SELECT ID, {', '.join(EXPECTED_COLUMNS)} FROM redbus_details", engine=engine, cache=None)
+    path = export_snapshot(normalize_bus_data(df), args.dir, data_version=data_version, keep=args.keep)
+    print(f"Exported {len(df)} rows to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
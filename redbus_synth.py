@@ -0,0 +1,131 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from redbus_data import EXPECTED_COLUMNS
+from redbus_ingest import OPERATOR_FILES
+
+# Operators and the cities their routes connect, after the state transport corporations scraped
+OPERATORS = {
+    "APSRTC": ["Vijayawada", "Visakhapatnam", "Tirupati", "Guntur", "Nellore", "Kurnool", "Hyderabad", "Chennai"],
+    "ASTC": ["Guwahati", "Tezpur", "Jorhat", "Dibrugarh", "Silchar", "Shillong", "Nagaon"],
+    "HRTC": ["Shimla", "Manali", "Dharamshala", "Chandigarh", "Delhi", "Kullu", "Hamirpur"],
+    "KSRTC": ["Thiruvananthapuram", "Kochi", "Kozhikode", "Thrissur", "Kannur", "Bangalore", "Mysore"],
+    "KTCL": ["Panaji", "Margao", "Mapusa", "Vasco", "Belgaum", "Pune", "Mumbai"],
+    "RSRTC": ["Jaipur", "Jodhpur", "Udaipur", "Ajmer", "Kota", "Bikaner", "Delhi"],
+    "SBSTC": ["Kolkata", "Durgapur", "Asansol", "Digha", "Bankura", "Siliguri", "Haldia"],
+    "TSRTC": ["Hyderabad", "Warangal", "Karimnagar", "Nizamabad", "Khammam", "Vijayawada", "Bangalore"],
+    "UPSRTC": ["Lucknow", "Kanpur", "Agra", "Varanasi", "Prayagraj", "Gorakhpur", "Delhi"],
+    "WBTC": ["Kolkata", "Siliguri", "Digha", "Durgapur", "Malda", "Bardhaman", "Haldia"],
+}
+
+# File redbus_ingest.py reads each operator from; both lists follow the scraping notebook's order
+# (which saved RSRTC as rsrst.csv)
+OPERATOR_FILE_NAMES = dict(zip(OPERATORS, OPERATOR_FILES))
+
+BUS_TYPES = [
+    "A/C Sleeper (2+1)", "NON A/C Sleeper (2+1)", "A/C Seater (2+2)", "NON A/C Seater (2+2)",
+    "Volvo Multi-Axle A/C Semi Sleeper (2+2)", "Scania AC Multi Axle Sleeper (2+1)",
+    "Super Luxury (Non-AC, 2 + 2 Push Back)", "Express (Non-AC Seater 2+3)",
+]
+BUS_TYPE_WEIGHTS = np.array([18, 10, 14, 22, 8, 5, 13, 10], dtype=float)
+PREMIUM_TYPES = {0, 2, 4, 5}
+
+SERVICE_NAMES = ["", " Express", " Super Deluxe", " Rajadhani", " Garuda Plus", " Airavat", " Swift", " Lahari"]
+
+
+def _route_catalog(rng, routes):
+    """Route names, links, operators and typical durations, in popularity order."""
+    catalog = []
+    operators = list(OPERATORS)
+    while len(catalog) < routes:
+        operator = operators[len(catalog) % len(operators)]
+        cities = OPERATORS[operator]
+        origin, destination = rng.choice(len(cities), size=2, replace=False)
+        name = f"{cities[origin]} to {cities[destination]}"
+        link = f"https://www.redbus.in/bus-tickets/{cities[origin].lower()}-to-{cities[destination].lower()}"
+        if any(existing[1] == link for existing in catalog):
+            link += f"?route={len(catalog)}"
+        catalog.append((name, link, operator, int(rng.integers(90, 900))))
+    return catalog
+
+
+def generate_bus_data(rows, routes=200, skew=1.1, seed=0):
+    """Generate ``rows`` realistic redbus_details rows as the scraper would save them.
+
+    Route popularity follows a Zipf-like distribution with exponent ``skew``,
+    so a few routes hold most departures, as in the real scrape. Times and
+    seat counts are strings in the scraped formats ("21:30", "07h 45m",
+    "23 Seats available").
+    """
+    rng = np.random.default_rng(seed)
+    catalog = _route_catalog(rng, routes)
+    weights = 1.0 / np.arange(1, routes + 1) ** skew
+    # Oversample a little so natural-key duplicates can be dropped
+    n = int(rows * 1.05) + 10
+
+    route_idx = rng.choice(routes, size=n, p=weights / weights.sum())
+    base_duration = np.array([entry[3] for entry in catalog])[route_idx]
+    bus_type = rng.choice(len(BUS_TYPES), size=n, p=BUS_TYPE_WEIGHTS / BUS_TYPE_WEIGHTS.sum())
+
+    # Departures cluster in the evening, with a smaller early-morning peak
+    evening = rng.normal(21 * 60, 120, size=n)
+    morning = rng.normal(6 * 60, 90, size=n)
+    departing = np.where(rng.random(n) < 0.7, evening, morning)
+    departing = (np.round(departing / 5) * 5).astype(int) % 1440
+    duration = np.maximum(30, base_duration + rng.normal(0, 25, size=n)).round().astype(int)
+    reaching = (departing + duration) % 1440
+
+    premium = np.isin(bus_type, list(PREMIUM_TYPES))
+    price = (duration * rng.uniform(1.2, 1.8, size=n) * np.where(premium, 1.6, 1.0) + 50).round(-1)
+    rating = np.round(np.clip(rng.normal(3.8, 0.6, size=n), 1.0, 5.0), 1)
+    rating[rng.random(n) < 0.1] = np.nan
+    seats = rng.integers(0, 45, size=n)
+
+    operators = np.array([entry[2] for entry in catalog])[route_idx]
+    service = rng.integers(0, len(SERVICE_NAMES), size=n)
+    number = rng.integers(1, 400, size=n)
+
+    df = pd.DataFrame({
+        "route_name": np.array([entry[0] for entry in catalog])[route_idx],
+        "route_link": np.array([entry[1] for entry in catalog])[route_idx],
+        "bus_name": [f"{op}{SERVICE_NAMES[s]} - {num}" for op, s, num in zip(operators, service, number)],
+        "bus_type": np.array(BUS_TYPES)[bus_type],
+        "departing_time": [f"{m // 60:02d}:{m % 60:02d}" for m in departing],
+        "duration": [f"{m // 60:02d}h {m % 60:02d}m" for m in duration],
+        "reaching_time": [f"{m // 60:02d}:{m % 60:02d}" for m in reaching],
+        "star_rating": rating,
+        "price": price,
+        "seats_available": [f"{s} Seats available" for s in seats],
+    }, columns=EXPECTED_COLUMNS)
+    df = df.drop_duplicates(subset=["route_link", "bus_name", "departing_time"])
+    return df.head(rows).reset_index(drop=True)
+
+
+def main():
+    """Write a synthetic dataset as one CSV, or as the per-operator CSVs redbus_ingest.py loads by default."""
+    parser = argparse.ArgumentParser(description="Generate synthetic redbus_details rows.")
+    parser.add_argument("--rows", type=int, default=100000, help="number of rows")
+    parser.add_argument("--routes", type=int, default=200, help="number of distinct routes")
+    parser.add_argument("--skew", type=float, default=1.1, help="route popularity skew (0 is uniform)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic.csv", help="CSV file to write")
+    parser.add_argument("--operator-dir", help="write the ten operator files redbus_ingest.py reads into this directory instead")
+    args = parser.parse_args()
+
+    df = generate_bus_data(args.rows, args.routes, args.skew, args.seed)
+    if args.operator_dir:
+        os.makedirs(args.operator_dir, exist_ok=True)
+        operator = df["bus_name"].str.extract(r"^(\w+)", expand=False)
+        for name, part in df.groupby(operator):
+            part.to_csv(os.path.join(args.operator_dir, OPERATOR_FILE_NAMES[name]), index=False)
+        print(f"Wrote {len(df)} rows for {operator.nunique()} operators to {args.operator_dir}")
+    else:
+        df.to_csv(args.out, index=False)
+        print(f"Wrote {len(df)} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Show the timing panel in the sidebar (also enabled with ?debug=1 in the app URL)
+DEBUG = os.environ.get("REDBUS_DEBUG", "") not in ("", "0", "false")
+
+_local = threading.local()
+
+
+class StageTimings:
+    """Per-stage latencies recorded during one rerun of the app."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = OrderedDict()
+
+    def add(self, stage, seconds):
+        calls, total = self.stages.get(stage, (0, 0.0))
+        self.stages[stage] = (calls + 1, total + seconds)
+
+    def total(self):
+        """Seconds since recording started."""
+        return time.perf_counter() - self.started
+
+    def rows(self):
+        """One ``{stage, calls, ms}`` dict per stage, in the order stages first ran."""
+        return [{"stage": stage, "calls": calls, "ms": round(total * 1000, 2)}
+                for stage, (calls, total) in self.stages.items()]
+
+
+def start_recording():
+    """Start recording stage timings for the current thread (one Streamlit rerun)."""
+    _local.timings = StageTimings()
+    return _local.timings
+
+
+def current_timings():
+    """The timings being recorded on this thread, or None."""
+    return getattr(_local, "timings", None)
+
+
+@contextmanager
+def timed(stage):
+    """Record how long the block takes under ``stage``; a no-op when nothing is recording."""
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.perf_counter() - start)
+
+
+def timed_stage(stage=None):
+    """Decorator form of ``timed``, defaulting the stage name to the function name."""
+    def decorate(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, text
+
+# Change log: one row per route changed by each load; MAX(version) is the data version
+CHANGES_TABLE = "redbus_changes"
+
+# Routes of a swap that has not been confirmed yet; see record_pending
+PENDING_TABLE = "redbus_pending_changes"
+
+# Seconds between version polls from the app
+POLL_INTERVAL = float(os.environ.get("REDBUS_POLL_INTERVAL", "5"))
+
+
+def changes_table(metadata=None):
+    """Describe the change log table."""
+    return Table(
+        CHANGES_TABLE, metadata or MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("version", Integer, nullable=False, index=True),
+        Column("route_name", String(255), nullable=False),
+        Column("changed_at", DateTime, nullable=False, server_default=func.now()),
+    )
+
+
+def pending_table(metadata=None):
+    """Describe the table of changes recorded before a swap and confirmed after it."""
+    return Table(
+        PENDING_TABLE, metadata or MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("version", Integer, nullable=False),
+        Column("route_name", String(255), nullable=False),
+    )
+
+
+def create_changes_table(engine):
+    """Create the change log and the pending changes table if they do not exist yet."""
+    metadata = MetaData()
+    changes_table(metadata)
+    pending_table(metadata)
+    metadata.create_all(engine, checkfirst=True)
+
+
+def current_version(conn):
+    """The latest data version, 0 before the first recorded load."""
+    if not inspect(conn).has_table(CHANGES_TABLE):
+        return 0
+    return conn.execute(text(f"SELECT COALESCE(MAX(version), 0) FROM {CHANGES_TABLE}")).scalar()
+
+
+def changed_routes(conn, since):
+    """Routes changed by any load after version ``since``."""
+    rows = conn.execute(
+        text(f"SELECT DISTINCT route_name FROM {CHANGES_TABLE} WHERE version > :since"),
+        {"since": since},
+    )
+    return {row[0] for row in rows}
+
+
+def record_changes(conn, version, routes):
+    """Log the routes a load changed under a new data version."""
+    if routes:
+        conn.execute(
+            text(f"INSERT INTO {CHANGES_TABLE} (version, route_name) VALUES (:version, :route_name)"),
+            [{"version": version, "route_name": route} for route in sorted(routes)],
+        )
+
+
+def record_pending(conn, version, routes):
+    """Note the routes a swap is about to change, before the swap can commit on its own.
+
+    MySQL commits RENAME TABLE implicitly, so a crash right after it would
+    leave the new table live under the old version. The pending rows let the
+    next load finish the job with confirm_pending.
+    """
+    discard_pending(conn)
+    if routes:
+        conn.execute(
+            text(f"INSERT INTO {PENDING_TABLE} (version, route_name) VALUES (:version, :route_name)"),
+            [{"version": version, "route_name": route} for route in sorted(routes)],
+        )
+
+
+def pending_routes(conn):
+    """Routes of a swap that was recorded as pending but never confirmed."""
+    if not inspect(conn).has_table(PENDING_TABLE):
+        return set()
+    return {row[0] for row in conn.execute(text(f"SELECT DISTINCT route_name FROM {PENDING_TABLE}"))}
+
+
+def confirm_pending(conn):
+    """Log the pending routes under a new data version and clear them; return the version, or None.
+
+    The version is the one recorded as pending unless a later load has used it since.
+    """
+    pending = conn.execute(text(f"SELECT MAX(version) FROM {PENDING_TABLE}")).scalar()
+    if pending is None:
+        return None
+    version = max(pending, current_version(conn) + 1)
+    record_changes(conn, version, pending_routes(conn))
+    discard_pending(conn)
+    return version
+
+
+def discard_pending(conn):
+    """Forget pending routes whose swap never happened."""
+    conn.execute(text(f"DELETE FROM {PENDING_TABLE}"))
+
+
+class VersionPoller:
+    """Tracks the data version seen by this process and invalidates cached routes that changed."""
+
+    def __init__(self, interval=POLL_INTERVAL):
+        self.interval = interval
+        self.version = None
+        self._checked = 0.0
+        self._since = (None, None, set())
+        self._lock = threading.Lock()
+
+    def poll(self, engine, cache):
+        """Check the version at most once per interval; return the routes invalidated."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked < self.interval:
+                return set()
+            self._checked = now
+            with engine.connect() as conn:
+                latest = current_version(conn)
+                if self.version is None or latest <= self.version:
+                    if self.version is None:
+                        self.version = latest
+                    return set()
+                routes = changed_routes(conn, self.version)
+            self.version = latest
+
+        def affected(key):
+            # Queries without a route parameter (such as the route list) span every route
+            params = dict(key[1])
+            return "route_name" not in params or params["route_name"] in routes
+
+        cache.invalidate(affected)
+        return routes
+
+    def changed_since(self, engine, since):
+        """Routes changed after version ``since`` up to the last polled version, or None before any poll.
+
+        A ``since`` of None (data of unknown version) counts every recorded change.
+        """
+        with self._lock:
+            latest = self.version
+            if latest is None:
+                return None
+            since = since or 0
+            if latest <= since:
+                return set()
+            if self._since[:2] != (since, latest):
+                with engine.connect() as conn:
+                    self._since = (since, latest, changed_routes(conn, since))
+            return self._since[2]
+
+
+version_poller = VersionPoller()
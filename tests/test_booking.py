@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+
+from redbus_booking import (CONFIRMED, KEY_REUSED, SOLD_OUT, UNKNOWN_BUS, BookingService, bookings,
+                            create_booking_tables, new_idempotency_key, seats_left)
+
+
+@pytest.fixture
+def service(engine, load_rows):
+    buses = pd.DataFrame([
+        {"route_name": "Jaipur to Ajmer", "route_link": "https://www.redbus.in/bus-tickets/jaipur-to-ajmer",
+         "bus_name": name, "bus_type": "A/C Seater (2+2)", "departing_time": "07:00", "duration": "02h 30m",
+         "reaching_time": "09:30", "star_rating": 4.0, "price": 300.0, "seats_available": seats}
+        for name, seats in [("RSRTC - 1", "30 Seats available"), ("RSRTC - 2", "3 Seats available")]
+    ])
+    load_rows(buses)
+    create_booking_tables(engine)
+    return BookingService(engine)
+
+
+def _request(bus_id, seats, key=None):
+    return {"idempotency_key": key or new_idempotency_key(), "bus_id": bus_id, "seats": seats,
+            "name": "Asha", "email": "asha@example.com", "phone": "9999999999", "payment_method": "Net Banking"}
+
+
+def _booked(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(bookings)).scalar()
+
+
+def test_resubmitting_a_key_returns_the_original_booking(engine, service):
+    request = _request(1, 2)
+
+    first = service.book(request)
+    again = service.book(dict(request))
+
+    assert first["status"] == CONFIRMED and not first["replayed"]
+    assert again == {"status": CONFIRMED, "booking_id": first["booking_id"], "replayed": True}
+    assert seats_left(engine, 1) == 28
+    assert _booked(engine) == 1
+
+
+def test_reusing_a_key_for_different_seats_is_refused(engine, service):
+    key = new_idempotency_key()
+    first = service.book(_request(1, 2, key))
+
+    assert service.book(_request(1, 5, key)) == {"status": KEY_REUSED, "booking_id": first["booking_id"]}
+    assert service.book(_request(2, 2, key))["status"] == KEY_REUSED
+    assert seats_left(engine, 1) == 28
+    assert _booked(engine) == 1
+
+
+def test_resubmits_within_one_batch_are_checked_against_the_original(engine, service):
+    key = new_idempotency_key()
+    batch = [(_request(1, 2, key), None), (_request(1, 2, key), None), (_request(1, 4, key), None)]
+
+    first, replay, reused = service._commit(batch)
+
+    assert replay == dict(first, replayed=True)
+    assert reused == {"status": KEY_REUSED, "booking_id": first["booking_id"]}
+    assert seats_left(engine, 1) == 28
+
+
+def test_sold_out_bus_rejects_the_booking_and_keeps_its_seats(engine, service):
+    assert service.book(_request(2, 2))["status"] == CONFIRMED
+
+    result = service.book(_request(2, 2))
+
+    assert result == {"status": SOLD_OUT, "seats_left": 1}
+    assert seats_left(engine, 2) == 1
+    assert _booked(engine) == 1
+
+
+def test_unknown_bus_is_not_booked(engine, service):
+    assert service.book(_request(99, 1)) == {"status": UNKNOWN_BUS}
+    assert _booked(engine) == 0
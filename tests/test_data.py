@@ -0,0 +1,9 @@
+import numpy as np
+
+from redbus_data import MISSING, parse_clock, parse_duration, parse_seats
+
+
+def test_out_of_range_values_do_not_wrap():
+    assert parse_clock(["23:59", "99:99"]).tolist() == [1439, MISSING]
+    assert parse_duration(["05h 30m", "600h 00m", "no duration"]).tolist() == [330, MISSING, MISSING]
+    assert parse_seats(["23 Seats available", "40000 Seats available", None]).tolist() == [23, np.iinfo(np.int16).max, 0]
@@ -0,0 +1,41 @@
+import numpy as np
+from sqlalchemy import text
+
+from redbus_bench import _filters_from
+from redbus_data import filter_buses, normalize_bus_data, to_query_filters
+from redbus_db import build_bus_query, run_query
+from redbus_synth import generate_bus_data
+
+
+def _route_frame(engine, route):
+    return run_query(*build_bus_query(route), engine=engine, cache=None, transform=normalize_bus_data)
+
+
+def test_every_filter_value_is_a_bound_parameter():
+    sql, params = build_bus_query("A to B", {"bus_type": "x' OR '1'='1", "min_price": 100, "star_rating": 4.25})
+    assert "x' OR" not in sql and "100" not in sql
+    assert params == {"route_name": "A to B", "bus_type": "x' OR '1'='1", "min_price": 100, "star_rating": 4.2}
+
+
+def test_sql_filters_select_the_same_buses_as_the_in_memory_chain(engine, load_rows):
+    load_rows(generate_bus_data(3000, routes=5))
+    route = run_query("SELECT route_name FROM redbus_details LIMIT 1", engine=engine, cache=None).iloc[0, 0]
+    frame = _route_frame(engine, route)
+
+    rated = frame.index[~np.isnan(frame['star_rating'].to_numpy())]
+    unrated = frame.index[np.isnan(frame['star_rating'].to_numpy())]
+    for position in list(rated[:15]) + list(unrated[:5]):
+        filters = _filters_from(frame.loc[position])
+        expected = set(filter_buses(frame, filters)['ID'])
+        sql, params = build_bus_query(route, to_query_filters(filters))
+        found = run_query(sql, params, engine=engine, cache=None)
+        assert set(found['ID']) == expected
+        assert frame.loc[position, 'ID'] in expected
+
+
+def test_filtered_route_query_uses_the_route_index(engine, load_rows):
+    load_rows(generate_bus_data(200, routes=3))
+    sql, params = build_bus_query("A to B", {"bus_type": "A/C Seater (2+2)", "min_price": 100, "max_price": 900})
+    with engine.connect() as conn:
+        plan = " ".join(str(row[-1]) for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params))
+    assert "idx_route_" in plan
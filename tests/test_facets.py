@@ -0,0 +1,68 @@
+import numpy as np
+
+from redbus_data import normalize_bus_data
+from redbus_facets import RouteFacets
+from redbus_synth import generate_bus_data
+
+
+def _route_frame():
+    df = normalize_bus_data(generate_bus_data(3000, routes=3))
+    busiest = df['route_name'].value_counts().index[0]
+    return df[(df['route_name'] == busiest).to_numpy()]
+
+
+def _matching(frame, selections):
+    mask = np.ones(len(frame), dtype=bool)
+    for facet, value in selections.items():
+        if facet == 'price':
+            mask &= (frame['price'] >= value[0]).to_numpy() & (frame['price'] <= value[1]).to_numpy()
+        else:
+            mask &= (frame[facet] == value).to_numpy()
+    return frame[mask]
+
+
+def test_options_narrow_as_selections_cascade():
+    frame = _route_frame()
+    facets = RouteFacets(frame)
+
+    bus_types = facets.options('bus_type')
+    assert sum(count for _, count in bus_types) == len(frame)
+    selections = {'bus_type': bus_types[0][0]}
+
+    selections['price'] = facets.price_bounds(selections)
+    departures = facets.options('departing_time', selections)
+    expected = _matching(frame, selections)['departing_time'].value_counts()
+    assert dict(departures) == {int(value): int(count) for value, count in expected.items()}
+    assert [value for value, _ in departures] == sorted(expected.index)
+
+    selections['departing_time'] = departures[0][0]
+    for facet in ('reaching_time', 'duration'):
+        options = facets.options(facet, selections)
+        assert options
+        assert sum(count for _, count in options) == len(_matching(frame, selections))
+
+
+def test_rows_match_every_selection():
+    frame = _route_frame()
+    facets = RouteFacets(frame)
+    row = frame.iloc[len(frame) // 2]
+    selections = {
+        'bus_type': row['bus_type'],
+        'price': (float(row['price']), float(row['price'])),
+        'departing_time': row['departing_time'],
+        'duration': row['duration'],
+    }
+
+    rows = facets.rows(selections)
+
+    assert row.name in rows.index
+    assert rows.index.equals(_matching(frame, selections).index)
+    # A repeated selection is answered from the memo
+    assert facets.rows(dict(selections)).index.equals(rows.index)
+
+
+def test_unknown_value_selects_nothing():
+    facets = RouteFacets(_route_frame())
+    assert facets.rows({'bus_type': 'Double Decker'}).empty
+    assert facets.options('departing_time', {'bus_type': 'Double Decker'}) == []
+    assert facets.price_bounds({'bus_type': 'Double Decker'}) is None
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from redbus_ingest import (LIVE_TABLE, SHADOW_TABLE, STAGING_TABLE, Loader, build_shadow, publish,
+                           recover_publish)
+from redbus_migrations import create_indexes, create_table, swap_tables
+from redbus_versions import changed_routes, create_changes_table, current_version, pending_routes, record_pending
+
+ROUTE = "Hyderabad to Vijayawada"
+
+
+def _bus(name, departing="21:30", seats=30, route=ROUTE):
+    return {
+        "route_name": route, "route_link": "https://www.redbus.in/bus-tickets/" + route.lower().replace(" ", "-"),
+        "bus_name": name, "bus_type": "A/C Seater (2+2)", "departing_time": departing, "duration": "05h 00m",
+        "reaching_time": "02:30", "star_rating": 4.1, "price": 650.0, "seats_available": f"{seats} Seats available",
+    }
+
+
+@pytest.fixture
+def live(engine):
+    create_table(engine)
+    create_indexes(engine)
+    create_changes_table(engine)
+    return engine
+
+
+def _stage(engine, rows, source):
+    create_table(engine, STAGING_TABLE)
+    create_indexes(engine, STAGING_TABLE, "_staging")
+    loader = Loader(engine, table=STAGING_TABLE)
+    loader.add([dict(row, source=source) for row in rows])
+    loader.flush()
+
+
+def _live_rows(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT bus_name, ID, seats_available FROM {LIVE_TABLE}"))
+        return {row.bus_name: (row.ID, row.seats_available) for row in rows}
+
+
+def test_reload_replaces_one_operator_and_keeps_another_on_the_same_route(live):
+    _stage(live, [_bus("APSRTC - 1"), _bus("APSRTC - 2")], "apsrtc")
+    publish(live)
+    _stage(live, [_bus("TSRTC - 7")], "tsrtc")
+    publish(live)
+    before = _live_rows(live)
+
+    _stage(live, [_bus("APSRTC - 1", seats=12)], "apsrtc")
+    version, routes = publish(live)
+
+    after = _live_rows(live)
+    assert set(after) == {"APSRTC - 1", "TSRTC - 7"}
+    assert after["APSRTC - 1"] == (before["APSRTC - 1"][0], "12 Seats available")
+    assert after["TSRTC - 7"] == before["TSRTC - 7"]
+    assert (version, routes) == (3, {ROUTE})
+    with live.connect() as conn:
+        assert current_version(conn) == 3
+        assert changed_routes(conn, 2) == {ROUTE}
+        assert not inspect(conn).has_table(STAGING_TABLE)
+
+
+def test_new_bus_never_reuses_the_id_of_a_dropped_one(live):
+    _stage(live, [_bus("Bus1"), _bus("Bus2", departing="22:00")], "apsrtc")
+    publish(live)
+    _stage(live, [_bus("Bus1"), _bus("Bus3", departing="23:00")], "apsrtc")
+    publish(live)
+
+    ids = {name: row[0] for name, row in _live_rows(live).items()}
+    assert ids == {"Bus1": 1, "Bus3": 3}
+
+
+def test_swap_interrupted_before_its_version_is_published_on_the_next_run(live):
+    _stage(live, [_bus("Bus1")], "apsrtc")
+    routes = build_shadow(live, 1)
+    with live.begin() as conn:
+        record_pending(conn, 1, routes)
+    # As if the process died between MySQL's RENAME TABLE and the version bump
+    swap_tables(live, LIVE_TABLE, SHADOW_TABLE)
+
+    assert recover_publish(live) == 1
+    with live.connect() as conn:
+        assert current_version(conn) == 1
+        assert changed_routes(conn, 0) == {ROUTE}
+        assert pending_routes(conn) == set()
+
+
+def test_pending_changes_of_a_swap_that_never_happened_are_dropped(live):
+    _stage(live, [_bus("Bus1")], "apsrtc")
+    routes = build_shadow(live, 1)
+    with live.begin() as conn:
+        record_pending(conn, 1, routes)
+
+    assert recover_publish(live) is None
+    assert _live_rows(live) == {}
+    with live.connect() as conn:
+        assert current_version(conn) == 0
+        assert pending_routes(conn) == set()
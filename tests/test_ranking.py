@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from redbus_data import normalize_bus_data
+from redbus_ranking import rank_closest_matches, score_matrix
+from redbus_synth import generate_bus_data
+
+
+def _frame():
+    return normalize_bus_data(generate_bus_data(2000, routes=3))
+
+
+def test_returns_the_k_closest_rows_in_ascending_score_order():
+    df = _frame()
+    target = df.iloc[100]
+    criteria = {col: target[col] for col in ('bus_type', 'departing_time', 'reaching_time', 'duration', 'star_rating')}
+    criteria.update(min_price=target['price'], max_price=target['price'])
+
+    result = rank_closest_matches(df, criteria, k=10)
+
+    assert len(result) == 10
+    assert result['match_score'].is_monotonic_increasing
+    assert result['match_score'].iloc[0] == 0
+    assert target.name in set(result.index[result['match_score'] == 0])
+    # The same rows a full sort of every score would pick
+    scores = score_matrix(df, [criteria])[0]
+    assert np.allclose(result['match_score'], np.sort(scores)[:10])
+
+
+def test_k_larger_than_the_frame_returns_every_row():
+    df = _frame().head(5)
+    assert len(rank_closest_matches(df, {'departing_time': 600}, k=10)) == 5
+
+
+def test_input_frame_is_not_modified():
+    df = _frame()
+    before = df.copy()
+    rank_closest_matches(df, {'bus_type': 'A/C Seater (2+2)', 'departing_time': 1290}, k=5)
+    assert 'match_score' not in df
+    pd.testing.assert_frame_equal(df, before)